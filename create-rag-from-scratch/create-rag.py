@@ -1,5 +1,19 @@
+import logging
+import os
+
 import requests
-import json
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
+
+try:
+    from orjson import dumps, loads
+except ImportError:  # 未安装 orjson 时退回标准库
+    import json
+
+    def dumps(obj):
+        return json.dumps(obj).encode('utf-8')
+
+    loads = json.loads
 
 corpus_of_documents = [
     "Take a leisurely walk in the park and enjoy the fresh air.",
@@ -24,13 +38,9 @@ def jaccard_similarity(query, document):
 def return_response(query, corpus):
     similarities = []
     for doc in corpus:
-        similarity = jaccard_similarity(user_input, doc)
+        similarity = jaccard_similarity(query, doc)
         similarities.append(similarity)
-    return corpus_of_documents[similarities.index(max(similarities))]
-
-user_input = "I don't like to hike"
-relevant_document = return_response(user_input, corpus_of_documents)
-full_response = []
+    return corpus[similarities.index(max(similarities))]
 
 prompt = """
 You are a bot that makes recommendations for activities. You answer in very short sentences and do not include extra information.
@@ -40,27 +50,66 @@ Compile a recommendation to the user based on the recommended activity and the u
 """
 
 url = 'http://localhost:11434/api/generate'
-data = {
-    "model": "llama3.1",
-    "prompt": prompt.format(user_input=user_input, relevant_document=relevant_document)
-}
-headers = {'Content-Type': 'application/json'}
-response = requests.post(url, data=json.dumps(data), headers=headers, stream=True)
 
-print(response)
+log = logging.getLogger(__name__)
 
-try:
-    count = 0
-    for line in response.iter_lines():
-        if line:
-            decoded_line = json.loads(line.decode('utf-8'))
-            
-            full_response.append(decoded_line['response'])
-finally:
-    response.close()
 
-print(''.join(full_response))
+# 429/5xx 等瞬时错误在同一个连接池内按指数退避自动重试
+def make_session():
+    # connect=0 / read=0：连接失败和读取超时都不重试，只重试 status_forcelist 中的状态码；
+    # 否则 Ollama 不可达或首个 token 较慢时会反复重发整个生成请求，突破超时上限
+    retry = Retry(
+        total=5,
+        connect=0,
+        read=0,
+        backoff_factor=0.25,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset(["GET", "POST"]),
+        respect_retry_after_header=True
+    )
+    session = requests.Session()
+    session.mount('http://', HTTPAdapter(max_retries=retry))
+    return session
+
+def main():
+    user_input = "I don't like to hike"
+    relevant_document = return_response(user_input, corpus_of_documents)
+    full_response = []
+
+    data = {
+        "model": "llama3.1",
+        "prompt": prompt.format(user_input=user_input, relevant_document=relevant_document)
+    }
+    headers = {'Content-Type': 'application/json'}
+    with make_session() as session:
+        # (连接, 读取) 超时：Ollama 不可达时快速失败，并限制流式分块之间的最长等待
+        response = session.post(url, data=dumps(data), headers=headers, stream=True, timeout=(3, 30))
+
+        log.debug("response: %s", response)
+
+        try:
+            response.raise_for_status()
+            # NDJSON：每行一个独立的 JSON 对象，直接按字节解析，done 为真时生成结束
+            for line in response.iter_lines(chunk_size=65536):
+                if line:
+                    decoded_line = loads(line)
+                    # 生成中途出错时 Ollama 仍返回 200，错误以 {"error": ...} 行的形式出现在流中
+                    if 'error' in decoded_line:
+                        raise RuntimeError(f"Ollama error: {decoded_line['error']}")
+                    if decoded_line.get('done'):
+                        break
+
+                    # 边接收边输出，首个 token 到达即可看到结果，无需等待整段生成完成
+                    token = decoded_line['response']
+                    print(token, end='', flush=True)
+                    full_response.append(token)
+        finally:
+            response.close()
+
+    print()
+    return ''.join(full_response)
 
-# print(return_response(user_input, corpus_of_documents))
 
-## 打印哟问题  
\ No newline at end of file
+if __name__ == "__main__":
+    logging.basicConfig(level=os.environ.get("LOGLEVEL", "INFO"))
+    main()
@@ -1,7 +1,17 @@
+import numpy as np
 from pymilvus import MilvusClient, DataType, AnnSearchRequest, WeightedRanker
 
+
+# 按行 L2 归一化，使 IP 内积等价于余弦相似度（范数下限为 float32 最小正数，零向量保持为零而不是 NaN）
+def normalize(vectors):
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.maximum(norms, np.finfo(np.float32).tiny)
+
+
 # ==================== 连接服务 ====================
-client = MilvusClient(uri="http://localhost:19530")  # 连接本地服务
+# 模块级客户端：下面所有操作共用这一条 gRPC 通道，并设置默认 RPC 超时
+client = MilvusClient(uri="http://localhost:19530", timeout=10)  # 连接本地服务
 
 # ==================== 创建集合 ====================
 schema = MilvusClient.create_schema(
@@ -12,28 +22,31 @@ schema.add_field(field_name="id", datatype=DataType.INT64, is_primary=True)
 schema.add_field(field_name="vector", datatype=DataType.FLOAT_VECTOR, dim=5)
 client.create_collection(collection_name="demo_v4", schema=schema)
 
+# ==================== 数据操作 ====================
+# 插入初始数据（向量先归一化，IP 内积即等价于余弦相似度）
+insert_data = [
+    {"id": 0, "vector": normalize([0.3580376395471989, -0.6023495712049978, 0.18414012509913835, -0.26286205330961354, 0.9029438446296592]).tolist(), "color": "pink_8682"},
+    {"id": 1, "vector": normalize([0.19886812562848388, 0.06023560599112088, 0.6976963061752597, 0.2614474506242501, 0.838729485096104]).tolist(), "color": "red_7025"}
+]
+client.insert(collection_name="demo_v4", data=insert_data)
+
 # ==================== 创建索引 ====================
+# 显式创建 HNSW 索引（插入后再建，避免小集合静默退化为 FLAT 暴力扫描）
 index_params = MilvusClient.prepare_index_params()
 index_params.add_index(
     field_name="vector",
-    metric_type="COSINE",
-    index_type="",  # 根据需求填写具体索引类型
-    index_name="vector_index"
+    metric_type="IP",
+    index_type="HNSW",
+    index_name="vector_index",
+    params={"M": 64, "efConstruction": 200}
 )
 client.create_index(collection_name="demo_v4", index_params=index_params)
+client.load_collection(collection_name="demo_v4")
 
-# ==================== 数据操作 ====================
-# 插入初始数据
-insert_data = [
-    {"id": 0, "vector": [0.3580376395471989, -0.6023495712049978, 0.18414012509913835, -0.26286205330961354, 0.9029438446296592], "color": "pink_8682"},
-    {"id": 1, "vector": [0.19886812562848388, 0.06023560599112088, 0.6976963061752597, 0.2614474506242501, 0.838729485096104], "color": "red_7025"}
-]
-client.insert(collection_name="demo_v4", data=insert_data)
-
-# 更新/插入数据
+# 更新/插入数据（同样先归一化）
 upsert_data = [
-    {"id": 0, "vector": [-0.619954382375778, 0.4479436794798608, -0.17493894838751745, -0.4248030059917294, -0.8648452746018911], "color": "black_9898"},
-    {"id": 1, "vector": [0.4762662251462588, -0.6942502138717026, -0.4490002642657902, -0.628696575798281, 0.9660395877041965], "color": "red_7319"}
+    {"id": 0, "vector": normalize([-0.619954382375778, 0.4479436794798608, -0.17493894838751745, -0.4248030059917294, -0.8648452746018911]).tolist(), "color": "black_9898"},
+    {"id": 1, "vector": normalize([0.4762662251462588, -0.6942502138717026, -0.4490002642657902, -0.628696575798281, 0.9660395877041965]).tolist(), "color": "red_7319"}
 ]
 client.upsert(collection_name='demo_v4', data=upsert_data)
 
@@ -45,43 +58,44 @@ client.delete(collection_name="demo_v4", ids=[18, 19])           # ID删除
 # 单向量搜索
 search_res = client.search(
     collection_name="demo_v4",
-    data=[[0.19886812562848388, 0.06023560599112088, 0.6976963061752597, 0.2614474506242501, 0.838729485096104]],
+    data=normalize([[0.19886812562848388, 0.06023560599112088, 0.6976963061752597, 0.2614474506242501, 0.838729485096104]]).tolist(),
     limit=2,
-    search_params={"metric_type": "IP", "params": {}}
+    search_params={"metric_type": "IP", "params": {"ef": 64}}
 )
 
 # 带过滤条件搜索
 filter_res = client.search(
     collection_name="demo_v4",
-    data=[[0.3580376395471989, -0.6023495712049978, 0.18414012509913835, -0.26286205330961354, 0.9029438446296592]],
+    data=normalize([[0.3580376395471989, -0.6023495712049978, 0.18414012509913835, -0.26286205330961354, 0.9029438446296592]]).tolist(),
     limit=5,
-    search_params={"metric_type": "IP", "params": {}},
+    search_params={"metric_type": "IP", "params": {"ef": 64}},
     output_fields=["color"],
     filter='color like "gree%"'
 )
 
 # 多向量混合搜索（高级用法）
 # 定义两个搜索请求
-query_vector1 = [[0.8896863042430693, 0.370613100114602, 0.23779315077113428, 0.38227915951132996, 0.5997064603128835]]
+query_vector1 = normalize([[0.8896863042430693, 0.370613100114602, 0.23779315077113428, 0.38227915951132996, 0.5997064603128835]]).tolist()
 search_param1 = {
     "data": query_vector1,
     "anns_field": "vector",
-    "param": {"metric_type": "L2", "params": {"nprobe": 10}},
+    "param": {"metric_type": "IP", "params": {"ef": 64}},
     "limit": 2
 }
 
-query_vector2 = [[0.02550758562349764, 0.006085637357292062, 0.5325251250159071, 0.7676432650114147, 0.5521074424751443]]
+query_vector2 = normalize([[0.02550758562349764, 0.006085637357292062, 0.5325251250159071, 0.7676432650114147, 0.5521074424751443]]).tolist()
 search_param2 = {
     "data": query_vector2,
     "anns_field": "vector",
-    "param": {"metric_type": "L2", "params": {"nprobe": 10}},
+    "param": {"metric_type": "IP", "params": {"ef": 64}},
     "limit": 2
 }
 
 # 执行混合搜索
 hybrid_res = client.hybrid_search(
-    requests=[AnnSearchRequest(&zwnj;**search_param1), AnnSearchRequest(**&zwnj;search_param2)],
-    rerank=WeightedRanker(0.8, 0.2),  # 设置权重
+    collection_name="demo_v4",
+    reqs=[AnnSearchRequest(**search_param1), AnnSearchRequest(**search_param2)],
+    ranker=WeightedRanker(0.8, 0.2),  # 设置权重
     limit=2
 )
 